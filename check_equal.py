@@ -1,7 +1,132 @@
-from sympy import symbols, sympify, simplify
+from itertools import product
+from collections import Counter
+from functools import lru_cache
+
+import numpy
+from sympy import lambdify, srepr, simplify
 from sympy.core.relational import Equality
 from alpha_solve import CellFunctionInput, CellFunctionResult, MetaFunctionResult
-from sympy_tools import from_latex
+from sympy_cache import cached_simplify, context_var_names, from_latex, sym, sympify_value
+
+try:
+    import symengine
+except ImportError:
+    # symengine is optional; SymPy handles everything without it
+    symengine = None
+
+
+def _numeric_value(expr):
+    """
+    Evaluate a fully bound expression to a float, through SymEngine's C++
+    evalf when available (roughly two orders of magnitude faster than
+    SymPy's). Returns None when the value doesn't reduce to a real float.
+    """
+    if symengine is not None:
+        try:
+            return float(symengine.sympify(expr).evalf(real=True))
+        except Exception:
+            pass
+    try:
+        return float(expr.evalf())
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=2048)
+def _simplify_diff(lhs, rhs):
+    """
+    Check whether lhs - rhs simplifies to zero.
+    Cached because structurally identical (lhs, rhs) pairs recur across
+    value combinations and recomputes, and simplify is expensive.
+    """
+    return simplify(lhs - rhs) == 0
+
+
+def _exprs_equal(lhs, rhs):
+    """
+    Decide whether two expressions are equal, cheapest checks first.
+    Substitution very often collapses both sides to the same expression, so
+    try structural identity, then a cheap expand, then SymPy's sampling-based
+    equals, and only fall back to full simplification when all else is
+    inconclusive.
+    """
+    if lhs == rhs:
+        return True
+
+    diff = lhs - rhs
+
+    # Fully numeric difference: a single numeric evaluation settles it
+    if not diff.free_symbols:
+        value = _numeric_value(diff)
+        if value is not None:
+            return abs(value) < 1e-12
+
+    if diff.expand() == 0:
+        return True
+
+    sampled = lhs.equals(rhs)
+    if sampled is not None:
+        return bool(sampled)
+
+    return _simplify_diff(lhs, rhs)
+
+
+@lru_cache(maxsize=256)
+def _lambdified(lhs, rhs, var_symbols):
+    """
+    Compile both sides of an equation into one NumPy-callable function.
+    Cached so repeated checks of the same equation (notebook recomputes)
+    pay the lambdify code generation cost once. cse=True makes
+    subexpressions shared between the two sides evaluate only once.
+    """
+    return lambdify(var_symbols, [lhs, rhs], modules='numpy', cse=True)
+
+
+def _compare_numeric(expr, var_symbols, value_lists):
+    """
+    Compare both sides of the equation over the full Cartesian product of
+    variable values as one vectorized NumPy evaluation.
+
+    Returns True/False when every value lowers to a finite float, or None
+    when the equation needs the exact symbolic path (symbolic values,
+    non-numeric results, or anything lambdify can't handle).
+    """
+    try:
+        grids = numpy.meshgrid(
+            *[numpy.array([float(sympify_value(v)) for v in values]) for values in value_lists],
+            indexing='ij'
+        )
+        f = _lambdified(expr.lhs, expr.rhs, tuple(var_symbols))
+        lhs_vals, rhs_vals = f(*grids)
+
+        # Constant sides come back as scalars; broadcast to the grid shape
+        shape = grids[0].shape
+        lhs_vals = numpy.broadcast_to(numpy.asarray(lhs_vals, dtype=float), shape).ravel()
+        rhs_vals = numpy.broadcast_to(numpy.asarray(rhs_vals, dtype=float), shape).ravel()
+    except Exception:
+        return None
+
+    if not (numpy.all(numpy.isfinite(lhs_vals)) and numpy.all(numpy.isfinite(rhs_vals))):
+        return None
+
+    # Same multiset comparison as the symbolic path: sort, then compare.
+    # Match _exprs_equal's 1e-12 threshold rather than allclose's loose
+    # defaults, which would report True for measurably different sides
+    # (e.g. x vs 1.00001*x). Differences in the gap between genuinely
+    # equal (float roundoff) and genuinely different are too close to
+    # decide at float precision; defer those to the symbolic path.
+    lhs_sorted = numpy.sort(lhs_vals)
+    rhs_sorted = numpy.sort(rhs_vals)
+    scale = numpy.maximum(
+        1.0, numpy.maximum(numpy.abs(lhs_sorted), numpy.abs(rhs_sorted))
+    )
+    diff = numpy.abs(lhs_sorted - rhs_sorted)
+
+    if bool(numpy.all(diff <= 1e-12 * scale)):
+        return True
+    if bool(numpy.all(diff <= 1e-6 * scale)):
+        return None
+    return False
 
 
 def meta_check_equal(input_data: CellFunctionInput) -> MetaFunctionResult:
@@ -14,10 +139,15 @@ def meta_check_equal(input_data: CellFunctionInput) -> MetaFunctionResult:
     - ALL variables in the equation are defined in the context
     """
     try:
-        latex = input_data.cell.get('latex', '').strip()
+        # Check the raw value before paying for .strip()'s allocation
+        raw = input_data.cell.get('latex')
+        if not raw or not raw.strip():
+            return MetaFunctionResult(index=25, name='Check Equality', use_result=False)
+        latex = raw.strip()
 
-        # Check if there's any content
-        if not latex:
+        # An Equality requires an equals sign; skip the expensive parse
+        # when there can't possibly be one
+        if '=' not in latex:
             return MetaFunctionResult(index=25, name='Check Equality', use_result=False)
 
         # Try to parse it
@@ -28,9 +158,9 @@ def meta_check_equal(input_data: CellFunctionInput) -> MetaFunctionResult:
             return MetaFunctionResult(index=25, name='Check Equality', use_result=False)
 
         # Check if ALL variables are in the context
-        context_var_names = {v.name for v in input_data.context.variables}
+        defined_names = context_var_names(input_data.context)
         all_vars_defined = all(
-            str(symbol) in context_var_names
+            symbol.name in defined_names
             for symbol in expr.free_symbols
         )
 
@@ -65,52 +195,92 @@ def check_equal(input_data: CellFunctionInput) -> CellFunctionResult:
             )
 
         # Build list of context variables and their values
-        from itertools import product
-
         context_vars_with_values = []
         for context_var in input_data.context.variables:
-            var_symbol = symbols(context_var.name)
+            var_symbol = sym(context_var.name)
             if var_symbol in expr.free_symbols and context_var.values:
                 context_vars_with_values.append((var_symbol, context_var.values))
 
         # If no context variables to check, just check the equation as-is
         if not context_vars_with_values:
-            lhs = simplify(expr.lhs)
-            rhs = simplify(expr.rhs)
-            is_equal = simplify(lhs - rhs) == 0
+            is_equal = _exprs_equal(expr.lhs, expr.rhs)
             result_text = 'True' if is_equal else 'False'
             return CellFunctionResult(
                 visible_solutions=[result_text],
                 new_context=input_data.context
             )
 
-        # Check all combinations of variable values
         var_symbols = [v[0] for v in context_vars_with_values]
         value_lists = [v[1] for v in context_vars_with_values]
 
+        # Fast path: purely numeric values can be checked in one vectorized
+        # NumPy evaluation instead of per-combination subs + simplify
+        numeric_result = _compare_numeric(expr, var_symbols, value_lists)
+        if numeric_result is not None:
+            return CellFunctionResult(
+                visible_solutions=['True' if numeric_result else 'False'],
+                new_context=input_data.context
+            )
+
+        # Sympify each value once up front; the product loop below would
+        # otherwise re-sympify every value per combination
+        sympified_value_lists = [
+            [sympify_value(v) for v in values] for values in value_lists
+        ]
+
+        # Check all combinations of variable values symbolically
         left_hand_sides = []
         right_hand_sides = []
-        for value_combo in product(*value_lists):
+        for value_combo in product(*sympified_value_lists):
             # Create substitution dictionary
-            subs_dict = dict(zip(var_symbols, [sympify(v) for v in value_combo]))
+            subs_dict = dict(zip(var_symbols, value_combo))
+
+            # Substitute; keys are plain Symbols, so xreplace can skip
+            # subs' pattern-matching machinery
+            lhs_result = expr.lhs.xreplace(subs_dict)
+            rhs_result = expr.rhs.xreplace(subs_dict)
 
-            # Substitute and simplify
-            lhs_result = simplify(expr.lhs.subs(subs_dict))
-            rhs_result = simplify(expr.rhs.subs(subs_dict))
+            # Only sides with symbolic residue need simplification; fully
+            # bound sides are settled numerically during comparison
+            if lhs_result.free_symbols:
+                lhs_result = cached_simplify(lhs_result)
+            if rhs_result.free_symbols:
+                rhs_result = cached_simplify(rhs_result)
 
             left_hand_sides.append(lhs_result)
             right_hand_sides.append(rhs_result)
 
-        # Sort by string representation for comparison
-        left_hand_sides_sorted = sorted(left_hand_sides, key=str)
-        right_hand_sides_sorted = sorted(right_hand_sides, key=str)
+        # Multiset comparison keyed on srepr: structurally identical pairs
+        # cancel without any string sorting or simplification
+        exprs_by_key = {}
+        left_counts = Counter()
+        right_counts = Counter()
+        for expression in left_hand_sides:
+            key = srepr(expression)
+            exprs_by_key[key] = expression
+            left_counts[key] += 1
+        for expression in right_hand_sides:
+            key = srepr(expression)
+            exprs_by_key[key] = expression
+            right_counts[key] += 1
 
-        # Compare element-by-element
-        all_equal = True
-        for i in range(len(left_hand_sides_sorted)):
-            if simplify(left_hand_sides_sorted[i] - right_hand_sides_sorted[i]) != 0:
-                all_equal = False
-                break
+        if left_counts == right_counts:
+            all_equal = True
+        else:
+            # Only the residue that didn't cancel structurally needs the
+            # expensive pairwise comparison
+            left_residue = sorted(
+                (exprs_by_key[k] for k in (left_counts - right_counts).elements()),
+                key=str
+            )
+            right_residue = sorted(
+                (exprs_by_key[k] for k in (right_counts - left_counts).elements()),
+                key=str
+            )
+            all_equal = all(
+                _exprs_equal(lhs_expr, rhs_expr)
+                for lhs_expr, rhs_expr in zip(left_residue, right_residue)
+            )
 
         # Return result
         result_text = 'True' if all_equal else 'False'
@@ -11,10 +11,123 @@ All results are analytical (symbolic). Bounds and integrand can contain variable
 from context or be symbolic expressions.
 """
 
+import logging
 import re
+from functools import lru_cache
+
 from alpha_solve import ProcMacroInput, ProcMacroResult, MetaFunctionResult
-from sympy_tools import from_latex
-from sympy import sympify, integrate, symbols
+from sympy_cache import from_latex, sym, to_latex
+from sympy import sympify, integrate, simplify
+
+logger = logging.getLogger(__name__)
+
+
+# Header of a definite integral: \int_{lower}^{upper}\left(
+# Bounds may appear without braces (\int_x^y...) because MathQuill removes
+# braces for single character subscripts/superscripts.
+# Compiled once at module scope so the hot path skips pattern compilation.
+_INTEGRAL_HEADER_PATTERN = re.compile(
+    r'\\int_(?:\{([^}]+)\}|([^\s\^\\]+))\^(?:\{([^}]+)\}|([^\s\\]+))\\left\('
+)
+
+# Trailing differential after the closing \right): d{var}
+_DIFFERENTIAL_PATTERN = re.compile(r'd([a-zA-Z])')
+
+# Groupless version of the same pattern for the meta check, which only needs
+# a boolean answer.
+_META_INTEGRAL_PATTERN = re.compile(
+    r'\\int_(?:\{[^}]+\}|[^\s\^\\]+)\^(?:\{[^}]+\}|[^\s\\]+)\\left\(.+?\\right\)d[a-zA-Z]'
+)
+
+
+# Whole-call memo: notebook recomputes re-run the macro with identical
+# (latex, context) pairs, and the result depends on nothing else
+_RESULT_CACHE = {}
+_RESULT_CACHE_MAX = 256
+
+
+@lru_cache(maxsize=512)
+def _antiderivative(integrand, var_symbol):
+    """Indefinite integral, cached so repeated integrands integrate once."""
+    return integrate(integrand, var_symbol)
+
+
+@lru_cache(maxsize=1024)
+def _cached_integrate(integrand, var_symbol, lower, upper):
+    """
+    Evaluate and simplify a definite integral, cached on the (already
+    substituted) operands so identical integrals skip SymPy entirely.
+
+    Polynomial integrands with numeric bounds take a fast path: evaluate the
+    cached antiderivative at the bounds, which skips SymPy's definite
+    integration machinery and needs no simplify (the difference of two
+    polynomial evaluations collapses to a number on its own). The gate
+    matters — for discontinuous integrands the antiderivative shortcut can
+    be wrong, so everything else keeps the full definite integrate.
+    """
+    if (lower.is_number and upper.is_number
+            and integrand.is_polynomial(var_symbol)):
+        antiderivative = _antiderivative(integrand, var_symbol)
+        return (antiderivative.xreplace({var_symbol: upper})
+                - antiderivative.xreplace({var_symbol: lower}))
+
+    return simplify(integrate(integrand, (var_symbol, lower, upper)))
+
+
+def _iter_integrals(latex):
+    """
+    Yield (start, end, lower, upper, integrand, var) for each complete
+    definite integral in the LaTeX string.
+
+    Two-stage scan: a regex finds the \\int_{...}^{...}\\left( header, then a
+    linear character scan finds the matching \\right) (tracking nesting) and
+    the trailing d{var}. Unlike a lazy-quantifier regex over the integrand,
+    this never backtracks and pairs nested \\left(...\\right) groups correctly.
+    """
+    pos = 0
+    length = len(latex)
+
+    while True:
+        header = _INTEGRAL_HEADER_PATTERN.search(latex, pos)
+        if not header:
+            return
+
+        # Scan forward for the \right) matching the header's \left(.
+        # Only backslash sequences matter, so jump between backslashes with
+        # C-level str.find instead of stepping per character.
+        depth = 1
+        i = header.end()
+        integrand_end = -1
+        while i < length:
+            if latex.startswith('\\left(', i):
+                depth += 1
+                i += 6
+            elif latex.startswith('\\right)', i):
+                depth -= 1
+                if depth == 0:
+                    integrand_end = i
+                    i += 7
+                    break
+                i += 7
+            else:
+                next_backslash = latex.find('\\', i + 1)
+                i = next_backslash if next_backslash != -1 else length
+
+        if integrand_end < 0:
+            # Unbalanced \left( — no complete integral remains
+            return
+
+        differential = _DIFFERENTIAL_PATTERN.match(latex, i)
+        if differential:
+            lower = (header.group(1) or header.group(2) or '').strip()
+            upper = (header.group(3) or header.group(4) or '').strip()
+            integrand = latex[header.end():integrand_end].strip()
+            yield (header.start(), differential.end(), lower, upper, integrand,
+                   differential.group(1))
+            pos = differential.end()
+        else:
+            # No trailing d{var}; skip this header and keep scanning
+            pos = header.end()
 
 
 def evaluate_integrals(input_data: ProcMacroInput) -> ProcMacroResult:
@@ -30,108 +143,125 @@ def evaluate_integrals(input_data: ProcMacroInput) -> ProcMacroResult:
     Returns:
         ProcMacroResult with integrals replaced by their analytical results in LaTeX
     """
-    modified_latex = input_data.latex
-
-    # Pattern to match: \int_{...}^{...}\left(...\right)d{var}
-    # OR: \int_x^y\left(...\right)d{var} (when bounds are single chars without braces)
-    # MathQuill removes braces for single character subscripts/superscripts
-    pattern = r'\\int_(?:\{([^}]+)\}|([^\s\^\\]+))\^(?:\{([^}]+)\}|([^\s\\]+))\\left\((.*?)\\right\)d([a-zA-Z])'
-
-    while True:
-        match = re.search(pattern, modified_latex)
-        if not match:
-            break
-
-        start_pos = match.start()
-        end_pos = match.end()
+    original_latex = input_data.latex
+
+    # Serve repeated calls straight from the whole-call memo
+    try:
+        cache_key = (original_latex, tuple(sorted(
+            (v.name, v.values[0])
+            for v in input_data.context.variables if v.values
+        )))
+    except Exception:
+        cache_key = None
+
+    if cache_key is not None:
+        cached = _RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            return ProcMacroResult(modified_latex=cached)
+
+    # Results never contain \int, so a single left-to-right pass over the
+    # original string is enough; collect the slices and join once instead of
+    # re-scanning and splicing the whole string per integral.
+    pieces = []
+    last_end = 0
+
+    # Context variables don't change between integrals; build the
+    # substitution dict once instead of per match
+    ctx_subs = {}
+    for context_var in input_data.context.variables:
+        if context_var.values:
+            try:
+                ctx_subs[sym(context_var.name)] = sympify(context_var.values[0])
+            except:
+                pass
 
-        # Extract components from the pattern
-        # Groups: (1) lower with braces, (2) lower without braces, (3) upper with braces, (4) upper without braces, (5) integrand, (6) var
-        lower_bound = (match.group(1) or match.group(2) or '').strip()
-        upper_bound = (match.group(3) or match.group(4) or '').strip()
-        integrand_latex = match.group(5).strip()
-        var = match.group(6)
+    # The same integral often appears several times in one blob; evaluate
+    # each distinct (lower, upper, integrand, var) tuple once
+    results_by_key = {}
 
+    for start, end, lower_bound, upper_bound, integrand_latex, var in _iter_integrals(original_latex):
         # Skip empty integrals (template not filled in)
         if not lower_bound or not upper_bound or not integrand_latex:
-            break
+            continue
 
-        try:
-            # Parse bounds using from_latex
-            from sympy_tools import from_latex
+        key = (lower_bound, upper_bound, integrand_latex, var)
+        if key in results_by_key:
+            result_str = results_by_key[key]
+            if result_str is not None:
+                pieces.append(original_latex[last_end:start])
+                pieces.append(result_str)
+                last_end = end
+            continue
 
+        try:
             # Convert bounds from LaTeX to sympy
             try:
                 lower_sym = from_latex(lower_bound)
             except:
                 # If parsing fails, try as a symbol
-                lower_sym = symbols(lower_bound)
+                lower_sym = sym(lower_bound)
 
             try:
                 upper_sym = from_latex(upper_bound)
             except:
                 # If parsing fails, try as a symbol
-                upper_sym = symbols(upper_bound)
+                upper_sym = sym(upper_bound)
 
             # Substitute context variables in bounds if they exist
-            bound_subs_dict = {}
-            for context_var in input_data.context.variables:
-                try:
-                    bound_subs_dict[symbols(context_var.name)] = sympify(context_var.values[0])
-                except:
-                    pass
-
-            if bound_subs_dict:
-                lower_sym = lower_sym.subs(bound_subs_dict)
-                upper_sym = upper_sym.subs(bound_subs_dict)
+            if ctx_subs:
+                lower_sym = lower_sym.xreplace(ctx_subs)
+                upper_sym = upper_sym.xreplace(ctx_subs)
 
             # Parse the integrand expression
             integrand = from_latex(integrand_latex)
 
             # Create variable symbol
-            var_symbol = symbols(var)
+            var_symbol = sym(var)
 
             # Substitute any other context variables in the integrand
-            subs_dict = {}
-            for context_var in input_data.context.variables:
-                if context_var.name != var and context_var.values:
-                    try:
-                        subs_dict[symbols(context_var.name)] = sympify(context_var.values[0])
-                    except:
-                        pass
+            # (the integration variable itself must stay symbolic)
+            subs_dict = {s: v for s, v in ctx_subs.items() if s.name != var}
 
             if subs_dict:
-                integrand = integrand.subs(subs_dict)
+                integrand = integrand.xreplace(subs_dict)
 
-            # Evaluate the definite integral
-            result = integrate(integrand, (var_symbol, lower_sym, upper_sym))
-
-            # Simplify the result
-            from sympy import simplify
-            result = simplify(result)
+            # Evaluate and simplify the definite integral (cached)
+            result = _cached_integrate(integrand, var_symbol, lower_sym, upper_sym)
 
             # Always return as LaTeX (analytical result)
-            from sympy_tools import to_latex
             result_str = to_latex(result)
-            print(f"[evaluate_integrals] Raw LaTeX from to_latex: {repr(result_str)}")
+            logger.debug("Raw LaTeX from to_latex: %r", result_str)
 
             # Wrap the result in parentheses if it's complex (contains operators or fractions)
             # This ensures it displays correctly in all contexts
             if any(op in result_str for op in ['+', '-', '\\frac']):
                 result_str = f'\\left({result_str}\\right)'
-                print(f"[evaluate_integrals] Wrapped in parens: {repr(result_str)}")
 
             # Replace the integral with the result
-            modified_latex = modified_latex[:start_pos] + result_str + modified_latex[end_pos:]
-            print(f"[evaluate_integrals] Full modified LaTeX: {repr(modified_latex)}")
+            results_by_key[key] = result_str
+            pieces.append(original_latex[last_end:start])
+            pieces.append(result_str)
+            last_end = end
 
         except Exception as e:
-            # If evaluation fails, skip this integral and try the next one
-            print(f"Failed to evaluate integral: {e}")
-            break
+            # If evaluation fails, leave this integral as-is and try the next
+            # one; remember the failure so duplicates don't retry it
+            results_by_key[key] = None
+            logger.debug("Failed to evaluate integral: %s", e)
+
+    if pieces:
+        pieces.append(original_latex[last_end:])
+        modified_latex = ''.join(pieces)
+    else:
+        modified_latex = original_latex
 
     if modified_latex != input_data.latex:
-        print(f"[evaluate_integrals] Returning modified LaTeX: {modified_latex}")
+        logger.debug("Returning modified LaTeX: %s", modified_latex)
+
+    if cache_key is not None:
+        if len(_RESULT_CACHE) >= _RESULT_CACHE_MAX:
+            _RESULT_CACHE.clear()
+        _RESULT_CACHE[cache_key] = modified_latex
 
     return ProcMacroResult(modified_latex=modified_latex)
 
@@ -148,8 +278,12 @@ def meta_evaluate_integrals(input_data: ProcMacroInput) -> MetaFunctionResult:
     """
     # Check if the latex contains definite integral patterns with the expected format
     # Pattern handles both \int_{x}^{y} and \int_x^y (with or without braces)
-    pattern = r'\\int_(?:\{[^}]+\}|[^\s\^\\]+)\^(?:\{[^}]+\}|[^\s\\]+)\\left\(.+?\\right\)d[a-zA-Z]'
-    has_complete_integral = bool(re.search(pattern, input_data.latex))
+    # Cheap literal test first: most cells contain no integral at all, and a
+    # C-level substring search beats starting up the regex engine
+    has_complete_integral = (
+        '\\int' in input_data.latex
+        and bool(_META_INTEGRAL_PATTERN.search(input_data.latex))
+    )
 
     return MetaFunctionResult(
         index=3,  # Priority order (run before num() at 5, after potential other macros)
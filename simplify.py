@@ -1,7 +1,8 @@
-from sympy import symbols, sympify, simplify
+from itertools import product
+
 from sympy.core.relational import Equality
 from alpha_solve import CellFunctionInput, CellFunctionResult, MetaFunctionResult
-from sympy_tools import from_latex, to_latex
+from sympy_cache import cached_simplify, from_latex, sym, sympify_value, to_latex
 
 
 def meta_simple_simplify(input_data: CellFunctionInput) -> MetaFunctionResult:
@@ -13,23 +14,23 @@ def meta_simple_simplify(input_data: CellFunctionInput) -> MetaFunctionResult:
     - LaTeX can be parsed into a SymPy expression
     """
     try:
-        latex = input_data.cell.get('latex', '').strip()
+        # Check the raw value before paying for .strip()'s allocation
+        raw = input_data.cell.get('latex')
+        if not raw or not raw.strip():
+            return MetaFunctionResult(index=50, name='Simplify', use_result=False)
+        latex = raw.strip()
 
-        # Check if there's any content
-        if not latex:
+        # Check for an equals sign before paying for the parse
+        if '=' in latex:
             return MetaFunctionResult(index=50, name='Simplify', use_result=False)
 
-        # Try to parse it first
+        # Try to parse it
         expr = from_latex(latex)
 
-        # Check if the parsed expression is an equation
+        # Check if the parsed expression is an equation anyway
         if isinstance(expr, Equality):
             return MetaFunctionResult(index=50, name='Simplify', use_result=False)
 
-        # Double-check for equals sign in raw LaTeX
-        if '=' in latex:
-            return MetaFunctionResult(index=50, name='Simplify', use_result=False)
-
         # It's simplifiable!
         return MetaFunctionResult(index=50, name='Simplify', use_result=True)
     except Exception as e:
@@ -50,11 +51,9 @@ def simple_simplify(input_data: CellFunctionInput) -> CellFunctionResult:
         expr = from_latex(latex)
 
         # Build list of context variables and their values
-        from itertools import product
-
         context_vars_with_values = []
         for context_var in input_data.context.variables:
-            var_symbol = symbols(context_var.name)
+            var_symbol = sym(context_var.name)
             if var_symbol in expr.free_symbols and context_var.values:
                 context_vars_with_values.append((var_symbol, context_var.values))
 
@@ -65,20 +64,31 @@ def simple_simplify(input_data: CellFunctionInput) -> CellFunctionResult:
             var_symbols = [v[0] for v in context_vars_with_values]
             value_lists = [v[1] for v in context_vars_with_values]
 
-            # Generate all combinations
-            for value_combo in product(*value_lists):
+            # Sympify each value once up front instead of once per combination
+            sympified_value_lists = [
+                [sympify_value(v) for v in values] for values in value_lists
+            ]
+
+            # Generate all combinations, deduplicating on the substituted
+            # expression so duplicate combinations never reach simplify
+            # (deduping the LaTeX afterwards would be too late to save work)
+            seen = {}
+            for value_combo in product(*sympified_value_lists):
                 # Create substitution dictionary
-                subs_dict = dict(zip(var_symbols, [sympify(v) for v in value_combo]))
+                subs_dict = dict(zip(var_symbols, value_combo))
 
-                # Substitute and simplify
-                substituted_expr = expr.subs(subs_dict)
-                simplified = simplify(substituted_expr)
+                # Substitute; plain-Symbol keys let xreplace skip subs'
+                # pattern-matching machinery
+                substituted_expr = expr.xreplace(subs_dict)
+                if substituted_expr in seen:
+                    continue
+                seen[substituted_expr] = cached_simplify(substituted_expr)
 
-                # Add to solutions
-                visible_solutions.append(to_latex(simplified))
+            # Add to solutions
+            visible_solutions.extend(to_latex(s) for s in seen.values())
         else:
             # No context variables to substitute, just simplify
-            simplified = simplify(expr)
+            simplified = cached_simplify(expr)
             visible_solutions.append(to_latex(simplified))
 
         # Remove duplicates while preserving order
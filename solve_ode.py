@@ -1,8 +1,91 @@
-from sympy import dsolve, symbols, Function, Derivative, Eq, sympify
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from sympy import dsolve, Function, Derivative, Eq, nan, zoo
 from sympy.core.relational import Equality
 from itertools import product
 from alpha_solve import CellFunctionInput, CellFunctionResult, MetaFunctionResult, Variable, Context
-from sympy_tools import from_latex, to_latex
+from sympy_cache import from_latex, sym, sympify_value, to_latex
+
+# Derivative notation markers: \frac{d...}, \partial, \dot/\ddot, primes.
+# A cell with none of these can't parse to a Derivative, so the meta check
+# can skip the expensive LaTeX parse entirely for ordinary cells.
+_DERIVATIVE_MARKER_PATTERN = re.compile(
+    r"\\frac\s*\{\s*d[^}]*\}|\\partial|\\dot|\\ddot|'"
+)
+
+
+@lru_cache(maxsize=256)
+def _applied_func(func_name, diff_var):
+    """
+    Applied undefined function like x(t), cached because Function() builds
+    a fresh UndefinedFunction class on every call and the same few
+    (name, variable) pairs recur across invocations.
+    """
+    return Function(func_name)(diff_var)
+
+
+@lru_cache(maxsize=256)
+def _cached_dsolve(equation, func):
+    """
+    Solve an ODE, cached because different value combinations (and notebook
+    recomputes) often produce structurally identical equations. Normalizes
+    dsolve's single-solution-or-list return to a tuple so cached results
+    can't be mutated. Failures raise and are not cached.
+    """
+    solutions = dsolve(equation, func)
+    if not isinstance(solutions, list):
+        solutions = [solutions]
+    return tuple(solutions)
+
+
+# Created on first use so importing the module never forks workers
+_POOL = None
+
+
+def _get_pool():
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _POOL
+
+
+def _dsolve_worker(equation, func):
+    """
+    Solve one ODE and fold the outcome into a value: ('ok', solutions) or
+    ('err', message). Exceptions can't cross the process boundary reliably,
+    so they are converted here rather than raised.
+    """
+    try:
+        return ('ok', _cached_dsolve(equation, func))
+    except Exception as solve_error:
+        return ('err', str(solve_error))
+
+
+def _dsolve_many(equations, func):
+    """
+    Solve each equation, returning {equation: outcome} with _dsolve_worker's
+    encoding. Each dsolve is an independent CPU-bound call that holds the
+    GIL, so when several are pending they are farmed out to a process pool;
+    anything the pool can't handle (unpicklable expressions, spawn failure)
+    falls back to solving serially in-process.
+    """
+    results = {}
+    if len(equations) > 1:
+        try:
+            outcomes = _get_pool().map(
+                _dsolve_worker, equations, [func] * len(equations)
+            )
+            for equation, outcome in zip(equations, outcomes):
+                results[equation] = outcome
+            return results
+        except Exception:
+            results.clear()
+    for equation in equations:
+        results[equation] = _dsolve_worker(equation, func)
+    return results
 
 
 def meta_solve_ode(input_data: CellFunctionInput) -> MetaFunctionResult:
@@ -15,10 +98,14 @@ def meta_solve_ode(input_data: CellFunctionInput) -> MetaFunctionResult:
     - Expression contains at least one Derivative
     """
     try:
-        latex = input_data.cell.get('latex', '').strip()
+        # Check the raw value before paying for .strip()'s allocation
+        raw = input_data.cell.get('latex')
+        if not raw or not raw.strip():
+            return MetaFunctionResult(index=90, name='ODE Solver', use_result=False)
+        latex = raw.strip()
 
-        # Check if there's any content
-        if not latex:
+        # No derivative notation means no ODE; skip the expensive parse
+        if not _DERIVATIVE_MARKER_PATTERN.search(latex):
             return MetaFunctionResult(index=90, name='ODE Solver', use_result=False)
 
         # Try to parse it
@@ -73,24 +160,29 @@ def solve_ode(input_data: CellFunctionInput) -> CellFunctionResult:
         func_expr = first_deriv.expr
 
         # Get the independent variable (what we're differentiating with respect to)
-        diff_var = first_deriv.variables[0] if first_deriv.variables else symbols('t')
+        diff_var = first_deriv.variables[0] if first_deriv.variables else sym('t')
 
         # If func_expr is a symbol, we need to convert it to a function
         if func_expr.is_Symbol:
-            func_name = str(func_expr)
+            func_name = func_expr.name
 
             # Create a function symbol: f(t) where f is the function name
-            func = Function(func_name)(diff_var)
+            func = _applied_func(func_name, diff_var)
 
             # Build replacement dictionary
             # Replace the symbol with the function
             replacements = {func_expr: func}
 
-            # Replace each derivative with the proper functional derivative
+            # Replace each derivative with the proper functional derivative.
+            # Check identity before structural equality (derivatives of the
+            # same symbol share it), and read the order from variable_count,
+            # which SymPy keeps pre-grouped, instead of recounting variables
             for deriv in derivatives:
-                if deriv.expr == func_expr:
-                    # Get the order of the derivative
-                    order = sum(1 for v in deriv.variables if v == diff_var)
+                if deriv.expr is func_expr or deriv.expr == func_expr:
+                    order = sum(
+                        count for v, count in deriv.variable_count
+                        if v == diff_var
+                    )
 
                     # Create new derivative with the function
                     if order == 1:
@@ -108,11 +200,14 @@ def solve_ode(input_data: CellFunctionInput) -> CellFunctionResult:
             func = func_expr
 
         # Build list of substitution combinations (same pattern as solve_simple.py)
-        # For each context variable, create substitution for each of its values
+        # For each context variable, create substitution for each of its values.
+        # free_symbols walks the whole tree, so compute it once here instead
+        # of per context variable
+        free = equation.free_symbols
         context_vars_with_values = []
         for context_var in input_data.context.variables:
-            var_symbol = symbols(context_var.name)
-            if var_symbol in equation.free_symbols:
+            var_symbol = sym(context_var.name)
+            if var_symbol in free:
                 context_vars_with_values.append((var_symbol, context_var.values))
 
         visible_solutions = []
@@ -123,37 +218,101 @@ def solve_ode(input_data: CellFunctionInput) -> CellFunctionResult:
             var_symbols = [v[0] for v in context_vars_with_values]
             value_lists = [v[1] for v in context_vars_with_values]
 
-            # Generate all combinations
-            for value_combo in product(*value_lists):
-                # Create substitution dictionary
-                subs_dict = dict(zip(var_symbols, [sympify(v) for v in value_combo]))
-
-                # Substitute and solve
-                substituted_eq = equation.subs(subs_dict)
-
+            # Sympify each value once up front instead of once per combination
+            sympified_value_lists = [
+                [sympify_value(v) for v in values] for values in value_lists
+            ]
+
+            # Build every substitution dict in one pass; both sweep paths
+            # below walk the same combinations, and the fallback would
+            # otherwise rebuild the dicts the general path already made
+            all_subs = [
+                dict(zip(var_symbols, value_combo))
+                for value_combo in product(*sympified_value_lists)
+            ]
+
+            # Solve once with the context variables left symbolic when
+            # dsolve can manage it; every combination then reduces to
+            # substituting values into the general solution, replacing a
+            # dsolve per combination with a cheap xreplace.
+            #
+            # Only sound for first-order equations: at higher orders,
+            # specializing parameters can change the *structure* of the
+            # solution without tripping the zoo/nan guard below — a
+            # repeated characteristic root silently drops the C2*x branch
+            # of C1*exp(-sqrt(k)*x) + C2*exp(sqrt(k)*x) at k=0, and a sign
+            # flip leaves complex exponentials where a fresh dsolve returns
+            # the real sin/cos form
+            general_solutions = None
+            first_order = all(
+                sum(count for _, count in deriv.variable_count) == 1
+                for deriv in equation.atoms(Derivative)
+            )
+            if first_order:
                 try:
-                    solutions = dsolve(substituted_eq, func)
-
-                    # dsolve can return a single solution or a list
-                    if not isinstance(solutions, list):
-                        solutions = [solutions]
-
-                    for solution in solutions:
+                    general_solutions = _cached_dsolve(equation, func)
+                except Exception:
+                    pass
+
+            # Combinations differing only in values the equation cancels out
+            # collapse to the same result; show each distinct one once
+            seen = set()
+
+            per_combo_outcomes = None
+            if general_solutions is not None:
+                per_combo_outcomes = []
+                for subs_dict in all_subs:
+                    specialized = [
+                        general.xreplace(subs_dict)
+                        for general in general_solutions
+                    ]
+
+                    # A degenerate specialization (e.g. a parameter the
+                    # general solution divides by going to zero) needs its
+                    # own solve; redo the sweep per combination
+                    if any(s.has(zoo, nan) for s in specialized):
+                        per_combo_outcomes = None
+                        seen.clear()
+                        break
+
+                    key = tuple(specialized)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    per_combo_outcomes.append(('ok', specialized))
+
+            if per_combo_outcomes is None:
+                # Substitute all combinations first; the sweep only needs
+                # each distinct equation solved once, and collecting them up
+                # front lets the independent dsolve calls run in parallel
+                substituted_eqs = []
+                for subs_dict in all_subs:
+                    # Keys are plain Symbols, so xreplace can skip subs'
+                    # pattern-matching machinery
+                    substituted_eq = equation.xreplace(subs_dict)
+                    if substituted_eq in seen:
+                        continue
+                    seen.add(substituted_eq)
+                    substituted_eqs.append(substituted_eq)
+
+                outcomes = _dsolve_many(substituted_eqs, func)
+                per_combo_outcomes = [
+                    outcomes[substituted_eq] for substituted_eq in substituted_eqs
+                ]
+
+            for status, payload in per_combo_outcomes:
+                if status == 'ok':
+                    for solution in payload:
                         visible_solutions.append(to_latex(solution))
                         # Extract the RHS of the solution (the actual expression)
                         if hasattr(solution, 'rhs'):
                             all_solution_exprs.append(solution.rhs)
-
-                except Exception as solve_error:
-                    visible_solutions.append(f"Could not solve ODE: {str(solve_error)}")
+                else:
+                    visible_solutions.append(f"Could not solve ODE: {payload}")
         else:
             # No context variables to substitute, solve directly
             try:
-                solutions = dsolve(equation, func)
-
-                # dsolve can return a single solution or a list
-                if not isinstance(solutions, list):
-                    solutions = [solutions]
+                solutions = _cached_dsolve(equation, func)
 
                 for solution in solutions:
                     visible_solutions.append(to_latex(solution))
@@ -165,12 +324,10 @@ def solve_ode(input_data: CellFunctionInput) -> CellFunctionResult:
                 visible_solutions.append(f"Could not solve ODE: {str(solve_error)}")
 
         # Add the solution to context
-        new_variables = list(input_data.context.variables)
-
         if all_solution_exprs:
             # Get the function name (e.g., 'x' from x(t))
             if func_expr.is_Symbol:
-                func_name = str(func_expr)
+                func_name = func_expr.name
             else:
                 # func is like x(t), extract the function name
                 func_name = str(func.func)
@@ -181,12 +338,18 @@ def solve_ode(input_data: CellFunctionInput) -> CellFunctionResult:
             # Create a variable with the solution
             new_var = Variable.create_analytical(func_name, solution_strings)
 
-            # Remove old variable with same name if exists
-            new_variables = [v for v in new_variables if v.name != func_name]
-            new_variables.append(new_var)
+            # Replace any old variable with the same name through one dict
+            # assignment instead of a linear scan and list rebuild; popping
+            # first keeps the updated variable at the end like before
+            var_map = {v.name: v for v in input_data.context.variables}
+            var_map.pop(func_name, None)
+            var_map[func_name] = new_var
 
-        # Create new context with updated variables
-        new_context = Context(variables=new_variables)
+            # Create new context with updated variables
+            new_context = Context(variables=list(var_map.values()))
+        else:
+            # Nothing changed; hand the existing context back untouched
+            new_context = input_data.context
 
         return CellFunctionResult(
             visible_solutions=visible_solutions,
@@ -1,7 +1,42 @@
-from sympy import solve, symbols, sympify, Eq
+from functools import lru_cache
+from itertools import product
+
+from sympy import solve, Eq, Poly, roots
 from sympy.core.relational import Equality
 from alpha_solve import CellFunctionInput, CellFunctionResult, MetaFunctionResult, Variable, Context, Dropdown
-from sympy_tools import from_latex, to_latex
+from sympy_cache import context_var_names, from_latex, sym, sympify_value, to_latex
+
+
+@lru_cache(maxsize=512)
+def _cached_solve(equation, var):
+    """
+    Solve an equation for a variable, cached because recomputes replay the
+    same solves. Returns a tuple so cached results can't be mutated.
+
+    Equations with no unknowns beyond var that are polynomial in var skip
+    solve's generic dispatch and go straight to the polynomial root finders:
+    roots() first (cheap, but can miss roots), then all_roots() when roots()
+    can't account for the polynomial's full degree. Anything Poly can't
+    handle falls through to the full solver.
+    """
+    if equation.free_symbols == {var}:
+        try:
+            poly = Poly(equation.lhs - equation.rhs, var)
+        except Exception:
+            poly = None
+
+        if poly is not None:
+            try:
+                root_map = roots(poly)
+                if sum(root_map.values()) == poly.degree():
+                    return tuple(root_map)
+            except Exception:
+                pass
+            try:
+                return tuple(poly.all_roots())
+            except Exception:
+                pass
+    return tuple(solve(equation, var))
 
 
 def meta_solve_simple(input_data: CellFunctionInput) -> MetaFunctionResult:
@@ -17,10 +52,15 @@ def meta_solve_simple(input_data: CellFunctionInput) -> MetaFunctionResult:
     Also provides a dropdown for selecting which variable to solve for.
     """
     try:
-        latex = input_data.cell.get('latex', '').strip()
+        # Check the raw value before paying for .strip()'s allocation
+        raw = input_data.cell.get('latex')
+        if not raw or not raw.strip():
+            return MetaFunctionResult(index=100, name='Simple Solver', use_result=False)
+        latex = raw.strip()
 
-        # Check if there's any content
-        if not latex:
+        # An Equality requires an equals sign; skip the expensive parse
+        # when there can't possibly be one
+        if '=' not in latex:
             return MetaFunctionResult(index=100, name='Simple Solver', use_result=False)
 
         # Try to parse it
@@ -34,12 +74,13 @@ def meta_solve_simple(input_data: CellFunctionInput) -> MetaFunctionResult:
         if not expr.free_symbols:
             return MetaFunctionResult(index=100, name='Simple Solver', use_result=False)
 
-        # Get variables that are NOT in the context
-        context_var_names = {v.name for v in input_data.context.variables}
-        unsolved_variables = [
-            str(symbol) for symbol in sorted(expr.free_symbols, key=str)
-            if str(symbol) not in context_var_names
-        ]
+        # Get variables that are NOT in the context; Symbols already carry
+        # their name as a plain attribute, so skip str() entirely
+        defined_names = context_var_names(input_data.context)
+        unsolved_variables = sorted(
+            symbol.name for symbol in expr.free_symbols
+            if symbol.name not in defined_names
+        )
 
         if not unsolved_variables:
             # All variables are already defined, don't use this solver
@@ -78,8 +119,10 @@ def solve_simple(input_data: CellFunctionInput) -> CellFunctionResult:
         # Parse the LaTeX equation
         expr = from_latex(latex)
 
-        # If it's an Eq object, extract left and right sides
-        if hasattr(expr, 'lhs') and hasattr(expr, 'rhs'):
+        # It must be an actual equation; a type check is faster than probing
+        # for lhs/rhs attributes and doesn't misfire on non-Equality
+        # relational objects that happen to carry both
+        if isinstance(expr, Equality):
             equation = expr
         else:
             # Not an equation, can't solve
@@ -93,19 +136,21 @@ def solve_simple(input_data: CellFunctionInput) -> CellFunctionResult:
 
         if not selected_var_name:
             # Fallback: use first unsolved variable if no dropdown selection
-            variables = list(equation.free_symbols)
+            variables = equation.free_symbols
             if not variables:
                 return CellFunctionResult(
                     visible_solutions=['No variables to solve for'],
                     new_context=input_data.context
                 )
 
-            context_var_names = {v.name for v in input_data.context.variables}
-            var = None
-            for candidate in sorted(variables, key=str):
-                if str(candidate) not in context_var_names:
-                    var = candidate
-                    break
+            # Pick the alphabetically first unsolved variable in one pass,
+            # without sorting the whole symbol set
+            defined_names = context_var_names(input_data.context)
+            var = min(
+                (s for s in variables if s.name not in defined_names),
+                key=lambda s: s.name,
+                default=None
+            )
 
             if var is None:
                 return CellFunctionResult(
@@ -114,7 +159,7 @@ def solve_simple(input_data: CellFunctionInput) -> CellFunctionResult:
                 )
         else:
             # Use the selected variable from dropdown
-            var = symbols(selected_var_name)
+            var = sym(selected_var_name)
 
             # Verify it's actually in the equation
             if var not in equation.free_symbols:
@@ -127,14 +172,14 @@ def solve_simple(input_data: CellFunctionInput) -> CellFunctionResult:
         # For each context variable, create substitution for each of its values
         context_vars_with_values = []
         for context_var in input_data.context.variables:
-            var_symbol = symbols(context_var.name)
+            var_symbol = sym(context_var.name)
             if var_symbol != var and var_symbol in equation.free_symbols:
                 context_vars_with_values.append((var_symbol, context_var.values))
 
-        # Generate all combinations of substitutions
-        from itertools import product
-
-        all_solutions = set()  # Use set to avoid duplicates
+        # Deduplicate solutions with an insertion-ordered dict instead of a
+        # set, so results display in the order they were found and each
+        # distinct solution is rendered to LaTeX exactly once
+        all_solutions = {}
         visible_solutions = []
 
         if context_vars_with_values:
@@ -142,45 +187,54 @@ def solve_simple(input_data: CellFunctionInput) -> CellFunctionResult:
             var_symbols = [v[0] for v in context_vars_with_values]
             value_lists = [v[1] for v in context_vars_with_values]
 
+            # Sympify each value once up front instead of once per combination
+            sympified_value_lists = [
+                [sympify_value(v) for v in values] for values in value_lists
+            ]
+
             # Generate all combinations
-            for value_combo in product(*value_lists):
+            for value_combo in product(*sympified_value_lists):
                 # Create substitution dictionary
-                subs_dict = dict(zip(var_symbols, [sympify(v) for v in value_combo]))
+                subs_dict = dict(zip(var_symbols, value_combo))
 
-                # Substitute and solve
-                substituted_eq = equation.subs(subs_dict)
-                solutions = solve(substituted_eq, var)
+                # Substitute and solve; plain-Symbol keys let xreplace skip
+                # subs' pattern-matching machinery
+                substituted_eq = equation.xreplace(subs_dict)
+                solutions = _cached_solve(substituted_eq, var)
 
-                # Collect solutions
+                # Collect solutions, formatting each new one as it appears
                 for solution in solutions:
-                    all_solutions.add(solution)
+                    if solution not in all_solutions:
+                        all_solutions[solution] = to_latex(Eq(var, solution))
         else:
             # No context variables to substitute, solve directly
-            solutions = solve(equation, var)
-            all_solutions.update(solutions)
+            for solution in _cached_solve(equation, var):
+                if solution not in all_solutions:
+                    all_solutions[solution] = to_latex(Eq(var, solution))
 
         # Format the solutions
-        new_variables = list(input_data.context.variables)
-
         if all_solutions:
-            # Convert solutions to list and format
-            solution_strings = []
-            for solution in all_solutions:
-                solution_eq = Eq(var, solution)
-                visible_solutions.append(to_latex(solution_eq))
-                solution_strings.append(str(solution))
+            # The LaTeX was already rendered during collection
+            visible_solutions.extend(all_solutions.values())
+            solution_strings = [str(solution) for solution in all_solutions]
 
             # Add or update the variable in context with all solutions
-            new_var = Variable.create_analytical(str(var), solution_strings)
+            new_var = Variable.create_analytical(var.name, solution_strings)
+
+            # Replace any old variable with the same name through one dict
+            # assignment instead of a linear scan and list rebuild; popping
+            # first keeps the updated variable at the end like before
+            var_map = {v.name: v for v in input_data.context.variables}
+            var_map.pop(new_var.name, None)
+            var_map[new_var.name] = new_var
 
-            # Remove old variable with same name if exists
-            new_variables = [v for v in new_variables if v.name != str(var)]
-            new_variables.append(new_var)
+            # Create new context with updated variables
+            new_context = Context(variables=list(var_map.values()))
         else:
             visible_solutions.append(f"No solution found for {var}")
 
-        # Create new context with updated variables
-        new_context = Context(variables=new_variables)
+            # Nothing changed; hand the existing context back untouched
+            new_context = input_data.context
 
         return CellFunctionResult(
             visible_solutions=visible_solutions,
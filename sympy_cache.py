@@ -0,0 +1,77 @@
+"""
+Shared caching helpers for the solver modules.
+
+LaTeX parsing and SymPy simplification are by far the most expensive steps
+in this plugin, and the meta/cell function split means the same cell content
+is processed several times per recompute. These bounded caches turn repeated
+work into a dict lookup. SymPy expressions are immutable and hashable, so
+they are safe both as cache keys and as shared return values.
+"""
+
+import weakref
+from functools import lru_cache
+
+from sympy import Symbol, simplify, sympify
+
+import sympy_tools
+
+
+@lru_cache(maxsize=4096)
+def from_latex(latex):
+    """Parse LaTeX into a SymPy expression, cached on the raw string."""
+    return sympy_tools.from_latex(latex)
+
+
+@lru_cache(maxsize=4096)
+def to_latex(expr):
+    """Render a SymPy expression as LaTeX, cached on the expression."""
+    return sympy_tools.to_latex(expr)
+
+
+@lru_cache(maxsize=1024)
+def cached_simplify(expr):
+    """
+    Simplify an expression, cached because recomputes re-simplify the same
+    (substituted) expressions and simplify is SymPy's heaviest call here.
+    """
+    return simplify(expr)
+
+
+@lru_cache(maxsize=4096)
+def sympify_value(value):
+    """
+    Sympify a context-variable value, cached on the raw value.
+    The same handful of value strings is substituted over and over across
+    cells and recomputes.
+    """
+    return sympify(value)
+
+
+# Weak so cached name sets die with their context instead of leaking
+_CTX_NAMES = weakref.WeakKeyDictionary()
+
+
+def context_var_names(context):
+    """
+    Frozenset of the variable names defined in a context, cached on the
+    context object. The same context instance is handed to every meta
+    function for a cell, so the set is built once instead of per meta.
+    Contexts that can't be hashed or weak-referenced just rebuild it.
+    """
+    try:
+        names = _CTX_NAMES.get(context)
+        if names is None:
+            names = frozenset(v.name for v in context.variables)
+            _CTX_NAMES[context] = names
+        return names
+    except TypeError:
+        return frozenset(v.name for v in context.variables)
+
+
+@lru_cache(maxsize=1024)
+def sym(name):
+    """
+    Symbol for a variable name, cached so hot loops skip SymPy's
+    string parsing and assumptions machinery on every lookup.
+    """
+    return Symbol(name)